@@ -1,14 +1,18 @@
 #!/usr/bin/env python
 
+import functools
 import hashlib
 import os
 import re
+import shutil
 import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
 from pathlib import Path
 
 import requests
 
-from komodo.shell import pushd, shell
+from komodo.shell import shell
 
 # When running cmake we pass the option -DDEST_PREFIX=fakeroot, this is an
 # absolute hack to be able to build opm-common and sunbeam with the ~fakeroot
@@ -48,19 +52,20 @@ def cmake(
         f"-DDEST_PREFIX={fakeroot}",
     ]
 
-    Path(bdir).mkdir(parents=True, exist_ok=True)
-    with pushd(bdir):
-        os.environ["LD_LIBRARY_PATH"] = ld_lib_path
-        _pre_PATH = os.environ["PATH"]  # pylint: disable=invalid-name
-        os.environ["PATH"] = bin_path
-
-        print(f"Installing {package_name} ({ver}) from source with cmake")
-        shell([cmake, pkgpath, *flags, makeopts])
-        print(shell(f"make -j{jobs}"))
-        print(shell(f"make DESTDIR={fakeroot} install"))
+    # The environment is passed to each subprocess rather than set in
+    # os.environ, as packages may be built concurrently in several threads.
+    env = os.environ.copy()
+    if ld_lib_path is not None:
+        env["LD_LIBRARY_PATH"] = ld_lib_path
+    if bin_path is not None:
+        env["PATH"] = bin_path
 
-        del os.environ["LD_LIBRARY_PATH"]
-        os.environ["PATH"] = _pre_PATH
+    Path(bdir).mkdir(parents=True, exist_ok=True)
+    print(f"Installing {package_name} ({ver}) from source with cmake")
+    shell([cmake, pkgpath, *flags, makeopts], cwd=bdir, env=env)
+    # The generated install target depends on all, so a single make both
+    # builds and installs the package
+    print(shell(f"make -j{jobs} DESTDIR={fakeroot} install", cwd=bdir, env=env))
 
 
 def sh(
@@ -81,24 +86,23 @@ def sh(
 ):  # pylint: disable=invalid-name
     makefile = data.get(makefile)
 
-    with pushd(pkgpath):
-        cmd = [
-            f"bash {makefile} --prefix {prefix}",
-            f"--fakeroot {fakeroot}",
-            f"--python {prefix}/bin/python",
-        ]
-        if jobs:
-            cmd.append(f"--jobs {jobs}")
-        if cmake:
-            cmd.append(f"--cmake {cmake}")
-        cmd.append(f"--pythonpath {pythonpath}")
-        cmd.append(f"--path {bin_path}")
-        cmd.append(f"--pip {pip}")
-        cmd.append(f"--ld-library-path {ld_lib_path}")
-        cmd.append(makeopts)
-
-        print(f"Installing {package_name} ({ver}) from sh")
-        shell(cmd)
+    cmd = [
+        f"bash {makefile} --prefix {prefix}",
+        f"--fakeroot {fakeroot}",
+        f"--python {prefix}/bin/python",
+    ]
+    if jobs:
+        cmd.append(f"--jobs {jobs}")
+    if cmake:
+        cmd.append(f"--cmake {cmake}")
+    cmd.append(f"--pythonpath {pythonpath}")
+    cmd.append(f"--path {bin_path}")
+    cmd.append(f"--pip {pip}")
+    cmd.append(f"--ld-library-path {ld_lib_path}")
+    cmd.append(makeopts)
+
+    print(f"Installing {package_name} ({ver}) from sh")
+    shell(cmd, cwd=pkgpath)
 
 
 def rsync(package_name, ver, pkgpath, prefix, fakeroot, makeopts=None):
@@ -114,6 +118,33 @@ def rsync(package_name, ver, pkgpath, prefix, fakeroot, makeopts=None):
     )
 
 
+_CHUNK_SIZE = 1 << 20
+
+
+def _mount_https_adapter(session, pool_maxsize=requests.adapters.DEFAULT_POOLSIZE):
+    session.mount(
+        "https://",
+        requests.adapters.HTTPAdapter(max_retries=20, pool_maxsize=pool_maxsize),
+    )
+
+
+# Shared by all downloads, so that connections are kept alive between them
+_SESSION = requests.Session()
+_mount_https_adapter(_SESSION)
+
+
+def _file_digest(file_handle, digest):
+    """Fallback for hashlib.file_digest, which is only available from
+    python 3.11.
+    """
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(file_handle, digest)
+    hash_object = hashlib.new(digest)
+    while chunk := file_handle.read(_CHUNK_SIZE):
+        hash_object.update(chunk)
+    return hash_object
+
+
 def download(package_name, ver, prefix, url, hash_str, fakeroot, destination):
     print(f"Installing {package_name} ({ver}) with download")
 
@@ -131,25 +162,22 @@ def download(package_name, ver, prefix, url, hash_str, fakeroot, destination):
     fakeprefix = Path(fakeroot + prefix)
     dest_path = fakeprefix / destination
 
-    session = requests.Session()
-    session.mount("https://", requests.adapters.HTTPAdapter(max_retries=20))
-    response = session.get(url, stream=True)
-
-    if response.status_code != 200:
-        msg = f"GET request to {url} returned status code {response.status_code}"
-        raise RuntimeError(
-            msg,
-        )
+    with _SESSION.get(url, stream=True) as response:
+        if response.status_code != 200:
+            msg = f"GET request to {url} returned status code {response.status_code}"
+            raise RuntimeError(
+                msg,
+            )
 
-    sha256 = hashlib.sha256()
+        response.raw.decode_content = True
+        with open(dest_path, "wb") as file_handle:
+            shutil.copyfileobj(response.raw, file_handle, length=_CHUNK_SIZE)
 
-    with open(dest_path, "wb") as file_handle:
-        for chunk in response.iter_content(chunk_size=1024):
-            file_handle.write(chunk)
-            sha256.update(chunk)
+    with open(dest_path, "rb") as file_handle:
+        digest = _file_digest(file_handle, "sha256").hexdigest()
 
-    if sha256.hexdigest() != hash_value:
-        msg = f"Hash of downloaded file ({sha256.hexdigest()}) not equal to expected hash."
+    if digest != hash_value:
+        msg = f"Hash of downloaded file ({digest}) not equal to expected hash."
         raise ValueError(
             msg,
         )
@@ -165,6 +193,7 @@ def noop(package_name, ver):
     print(f"Doing nothing for noop package {package_name} ({ver})")
 
 
+@functools.cache
 def pypaths(prefix, version):
     if version is None:
         return ""
@@ -173,15 +202,66 @@ def pypaths(prefix, version):
     if not match:
         return ""
     pyver = "python" + ".".join(match.groups())
-    return ":".join(
+    return os.pathsep.join(
         [
-            f"{prefix}/lib/{pyver}",
-            f"{prefix}/lib/{pyver}/site-packages",
-            f"{prefix}/lib64/{pyver}/site-packages",
+            os.path.join(prefix, "lib", pyver),
+            os.path.join(prefix, "lib", pyver, "site-packages"),
+            os.path.join(prefix, "lib64", pyver, "site-packages"),
         ],
     )
 
 
+def dependency_graph(
+    pkgs: dict[str, str], repo: dict[str, dict[str, dict]]
+) -> dict[str, set[str]]:
+    """Map every package in the release that make builds to the packages it
+    depends on among those. Pip packages are left out, as they are installed
+    after make, so their dependencies (even cyclic ones) do not constrain the
+    build order. Python is made a dependency of every other package as it
+    must be installed first.
+    """
+    built_packages = frozenset(
+        package_name
+        for package_name, version in pkgs.items()
+        if repo[package_name][version].get("make") != "pip"
+    )
+    graph = {}
+    for package_name, version in pkgs.items():
+        if package_name not in built_packages:
+            continue
+        depends = repo[package_name][version].get("depends", ())
+        graph[package_name] = set(depends) & built_packages
+        if "python" in built_packages and package_name != "python":
+            graph[package_name].add("python")
+    return graph
+
+
+def build_in_dependency_order(graph: dict[str, set[str]], build, jobs=1) -> None:
+    """Call build on every package in graph using up to jobs threads, starting
+    a package only once all of its dependencies have been built.
+    """
+    sorter = TopologicalSorter(graph)
+    if jobs == 1:
+        # No need for a thread pool when building one package at a time
+        for package_name in sorter.static_order():
+            build(package_name)
+        return
+    sorter.prepare()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while sorter.is_active():
+            for package_name in sorter.get_ready():
+                running[executor.submit(build, package_name)] = package_name
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                try:
+                    future.result()
+                except Exception:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+                sorter.done(running.pop(future))
+
+
 def make(
     pkgs: dict[str, str],
     repo,
@@ -193,15 +273,14 @@ def make(
     cmk="cmake",
     pip="pip",
     fakeroot=".",
+    package_jobs=1,
 ):
-    pkgorder = list(pkgs.keys())
-    # We only need to ensure that python is 'installed' first
-    if "python" in pkgorder:
-        pkgorder.remove("python")
-        pkgorder.insert(0, "python")
+    graph = dependency_graph(pkgs, repo)
+    if package_jobs > requests.adapters.DEFAULT_POOLSIZE:
+        _mount_https_adapter(_SESSION, pool_maxsize=package_jobs)
 
     fakeprefix = fakeroot + prefix
-    shell(["mkdir -p", fakeprefix])
+    Path(fakeprefix).mkdir(parents=True, exist_ok=True)
     prefix = os.path.abspath(prefix)
 
     os.environ["DESTDIR"] = fakeroot
@@ -220,17 +299,16 @@ def make(
     build_pythonpath = pypaths(fakeprefix, pkgs.get("python"))
     bin_path = ":".join([os.path.join(fakeprefix, "bin"), os.environ["PATH"]])
 
-    pkgpaths = [f"{package_name}-{pkgs[package_name]}" for package_name in pkgorder]
-    if dlprefix:
-        pkgpaths = [os.path.join(dlprefix, path) for path in pkgpaths]
-
     def resolve(input_str):
         return input_str.replace("$(prefix)", prefix)
 
-    for package_name, path in zip(pkgorder, pkgpaths, strict=False):
+    def build(package_name):
         ver = pkgs[package_name]
         current = repo[package_name][ver]
         make = current["make"]
+        path = f"{package_name}-{ver}"
+        if dlprefix:
+            path = os.path.join(dlprefix, path)
         pkgpath = os.path.abspath(path)
 
         download_keys = ["url", "destination", "hash"]
@@ -269,7 +347,7 @@ def make(
                 cmake=cmk,
             )
         elif make == "pip":
-            continue
+            return
         elif make == "sh":
             sh(
                 package_name=package_name,
@@ -310,3 +388,5 @@ def make(
             )
         else:
             raise ValueError(f"Non-supported make: {make}")
+
+    build_in_dependency_order(graph, build, package_jobs)
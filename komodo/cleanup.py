@@ -9,29 +9,28 @@ def cleanup(repository_file_path: str, release_files_path: list[str]):
     repository_file = RepositoryFile()(repository_file_path)
     repository = repository_file.content
 
-    releases = []
-    for file_name in release_files_path:
-        release_file = ReleaseFile()(file_name)
-        releases.append(release_file.content)
-
-    registered_package_version_combinations = [
-        (package, version) for package in repository for version in repository[package]
-    ]
-
-    seen_package_version_combinations = set()
-    for release in releases:
-        for package_name, package_version in release.items():
-            seen_package_version_combinations.add((package_name, package_version))
-
-    seen_all = True
-    for ver in registered_package_version_combinations:
-        if ver not in seen_package_version_combinations:
-            if seen_all:
-                print("unused:")
-                seen_all = False
-            print(f"  - {ver[0]}: {ver[1]}")
-    if seen_all:
+    releases = [ReleaseFile()(file_name).content for file_name in release_files_path]
+
+    registered_package_version_combinations = {
+        (package, version)
+        for package, versions in repository.items()
+        for version in versions
+    }
+    seen_package_version_combinations = {
+        (package_name, package_version)
+        for release in releases
+        for package_name, package_version in release.items()
+    }
+
+    unused_package_version_combinations = sorted(
+        registered_package_version_combinations - seen_package_version_combinations
+    )
+    if not unused_package_version_combinations:
         print("ok")
+        return
+    print("unused:")
+    for package_name, package_version in unused_package_version_combinations:
+        print(f"  - {package_name}: {package_version}")
 
 
 def main():
@@ -2,6 +2,7 @@ import argparse
 import contextlib
 import datetime
 import os
+import shutil
 import sys
 import uuid
 from collections.abc import Callable, Mapping, Sequence
@@ -33,6 +34,7 @@ class KomodoNamespace(argparse.Namespace):
     tmp: str
     downloads: str
     jobs: int
+    package_jobs: int
     download: bool
     build: bool
     install: bool
@@ -175,12 +177,13 @@ def build_non_pypi_packages_and_move_to_release_path(
         dlprefix=args.downloads,
         builddir=args.tmp,
         jobs=args.jobs,
+        package_jobs=args.package_jobs,
         cmk=args.cmake,
         pip=args.pip,
         fakeroot=str(fakeroot),
     )
 
-    shell(f"mv {args.release + str(tmp_prefix)} {args.release}")
+    shutil.move(args.release + str(tmp_prefix), args.release)
     with contextlib.suppress(OSError):
         os.removedirs(f"{args.release + str(tmp_prefix.parent)}")
 
@@ -417,6 +420,13 @@ def cli_main():
         _main(args)
 
 
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
 def parse_args(args: list[str]) -> KomodoNamespace:
     """Parse the arguments from the command line into an `argparse.Namespace`.
     Having a separated function makes it easier to test the CLI.
@@ -515,6 +525,15 @@ def parse_args(args: list[str]) -> KomodoNamespace:
         default=1,
         help="The number of parallel jobs to use for builds by cmake.",
     )
+    optional_args.add_argument(
+        "--package-jobs",
+        type=positive_int,
+        default=1,
+        help=(
+            "The number of packages to build concurrently. Packages are only "
+            "started once all of their dependencies have been built."
+        ),
+    )
     optional_args.add_argument(
         "--download",
         "-d",
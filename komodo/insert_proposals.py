@@ -1,13 +1,19 @@
 import argparse
 import contextlib
 import difflib
+import itertools
 import os
+import re
+import subprocess
+import tempfile
 from base64 import b64decode
 from collections.abc import Mapping, MutableSet
 from datetime import datetime
+from pathlib import Path
 
 import github
-from github import Github, UnknownObjectException
+from github import Github, InputGitTreeElement, UnknownObjectException
+from github.GitCommit import GitCommit
 from github.GitRef import GitRef
 from github.Repository import Repository
 
@@ -67,7 +73,57 @@ def _get_repo(token: str, fork: str, repo: str) -> Repository:
         return org.get_repo(repo)
 
 
+def _git_diff(file_contents, string, leftname, rightname):
+    """Unified diff without context lines, computed by git but with file
+    and hunk headers in the format of difflib.unified_diff. The hunks
+    themselves may differ from difflib, as git aligns changes differently.
+    Returns None if git is not available or fails.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        left, right = Path(tmpdir) / "left", Path(tmpdir) / "right"
+        left.write_text(file_contents, encoding="utf-8")
+        right.write_text(string, encoding="utf-8")
+        try:
+            result = subprocess.run(
+                [
+                    "git",
+                    "diff",
+                    "--no-index",
+                    "--no-color",
+                    "--no-ext-diff",
+                    "--unified=0",
+                    str(left),
+                    str(right),
+                ],
+                capture_output=True,
+                encoding="utf-8",
+                check=False,
+            )
+        except FileNotFoundError:
+            return None
+    # git exits with 1 if the files differ and with 0 if they do not
+    if result.returncode > 1:
+        return None
+    # Drop the git specific header lines and function context in the hunk
+    # headers, and turn "No newline at end of file" markers into missing
+    # newlines like difflib does
+    hunks = []
+    for line in itertools.dropwhile(
+        lambda line: not line.startswith("@@"), result.stdout.splitlines(True)
+    ):
+        if line.startswith("\\"):
+            hunks[-1] = hunks[-1].removesuffix("\n")
+        else:
+            hunks.append(re.sub(r"^(@@ [^@]* @@).*", r"\1", line))
+    if not hunks:
+        return ""
+    return "".join([f"--- {leftname}\n", f"+++ {rightname}\n", *hunks])
+
+
 def diff_file_and_string(file_contents, string, leftname, rightname):
+    diff = _git_diff(file_contents, string, leftname, rightname)
+    if diff is not None:
+        return diff
     return "".join(
         difflib.unified_diff(
             file_contents.splitlines(True),
@@ -183,20 +239,9 @@ Source code for this script can be found [here](https://github.com/equinor/komod
 def clean_proposals_file(
     proposal_file_content: Mapping[str, Mapping],
     upgrade_key: str,
-    repo: Repository,
-    git_ref: GitRef,
-    tmp_target,
-) -> None:
+) -> str:
     proposal_file_content[upgrade_key] = None
-    cleaned_upgrade = write_to_string(proposal_file_content, False)
-    upgrade_contents = repo.get_contents("upgrade_proposals.yml", ref=git_ref)
-    repo.update_file(
-        "upgrade_proposals.yml",
-        "Clean proposals",
-        cleaned_upgrade,
-        sha=upgrade_contents.sha,
-        branch=tmp_target,
-    )
+    return write_to_string(proposal_file_content, False)
 
 
 def create_pr_with_changes(
@@ -238,17 +283,26 @@ def create_pr_with_changes(
     )
 
 
-def create_new_release_file(
-    repo: Repository, target: str, release_content: str, branch
-) -> str:
-    new_release_file = f"releases/matrices/{target}.yml"
-    repo.create_file(
-        new_release_file,
-        f"Add release {target}",
-        release_content,
-        branch=branch,
+def commit_files(
+    repo: Repository,
+    base_commit: GitCommit,
+    branch: str,
+    files: Mapping[str, str],
+    message: str,
+) -> GitRef:
+    """Create branch pointing to a single commit on top of base_commit that
+    writes all of files, given as a mapping from path to content. Uses one
+    tree and one commit request, independently of the number of files.
+    """
+    tree = repo.create_git_tree(
+        [
+            InputGitTreeElement(path, "100644", "blob", content=content)
+            for path, content in files.items()
+        ],
+        base_commit.tree,
     )
-    return new_release_file
+    commit = repo.create_git_commit(message, tree, [base_commit])
+    return repo.create_git_ref(ref="refs/heads/" + branch, sha=commit.sha)
 
 
 def insert_proposals(
@@ -283,17 +337,24 @@ def insert_proposals(
         release_matrix_file.content, repofile, upgrade
     )
 
-    from_sha = repo.get_branch(git_ref).commit.sha
-    tmp_ref = repo.create_git_ref(ref="refs/heads/" + tmp_target, sha=from_sha)
-    new_release_file = create_new_release_file(
-        repo, target, new_release_contents, tmp_target
+    base_commit = repo.get_branch(git_ref).commit
+    from_sha = base_commit.sha
+    new_release_file = f"releases/matrices/{target}.yml"
+    tmp_ref = commit_files(
+        repo,
+        base_commit.commit,
+        tmp_target,
+        {
+            new_release_file: new_release_contents,
+            "upgrade_proposals.yml": clean_proposals_file(
+                proposal_file.content, upgrade_key
+            ),
+        },
+        f"Add release {target}",
     )
 
-    clean_proposals_file(proposal_file.content, upgrade_key, repo, git_ref, tmp_target)
-
-    base_content = repo.get_contents(base_file, ref=git_ref)
     diff = diff_file_and_string(
-        b64decode(base_content.content).decode(),
+        release_file_yaml_string.decode(),
         new_release_contents,
         base,
         target,
@@ -2,10 +2,21 @@ import argparse
 import functools
 import os
 import re
+from collections.abc import Mapping
 
 import ruamel.yaml
 from ruamel.yaml.compat import StringIO
 
+# Constructing a YAML instance is expensive, so one is shared by all
+# loads and dumps. It is not thread safe.
+_RUAMEL_INSTANCE = ruamel.yaml.YAML()
+_RUAMEL_INSTANCE.indent(  # Komodo prefers two space indendation
+    mapping=2,
+    sequence=4,
+    offset=2,
+)
+_RUAMEL_INSTANCE.width = 1000  # Avoid ruamel wrapping long
+
 
 def repository_specific_formatting(empty_line_top_level, yaml_string):
     """Transform function to ruamel.yaml's dump function. Makes sure there are
@@ -35,10 +46,7 @@ def is_repository(config):
     """
     if all(isinstance(package, str) for package in config.values()):
         return False
-    elif all(
-        isinstance(package, ruamel.yaml.comments.CommentedMap)
-        for package in config.values()
-    ):
+    elif all(isinstance(package, Mapping) for package in config.values()):
         return True
 
     # Mix of strings and dicts. Assume we have a release file.
@@ -49,14 +57,6 @@ def prettier(yaml_input_dict, check_type=True):
     """Takes in a string corresponding to a YAML Komodo configuration, and returns
     the corresponding prettified YAML string.
     """
-    ruamel_instance = ruamel.yaml.YAML()
-    ruamel_instance.indent(  # Komodo prefers two space indendation
-        mapping=2,
-        sequence=4,
-        offset=2,
-    )
-    ruamel_instance.width = 1000  # Avoid ruamel wrapping long
-
     komodo_repository = check_type and is_repository(yaml_input_dict)
 
     sorted_config = ruamel.yaml.comments.CommentedMap()
@@ -66,7 +66,7 @@ def prettier(yaml_input_dict, check_type=True):
     setattr(sorted_config, ruamel.yaml.comments.comment_attrib, yaml_input_dict.ca)
 
     yaml_output = StringIO()
-    ruamel_instance.dump(
+    _RUAMEL_INSTANCE.dump(
         sorted_config,
         yaml_output,
         transform=functools.partial(repository_specific_formatting, komodo_repository),
@@ -100,8 +100,9 @@ def prettified_yaml(filepath, check_only=True):
 
 def write_to_string(repository, check_type=True):
     if isinstance(repository, dict):
-        repository = dict(sorted(repository.items(), key=lambda t: t[0]))
-        repository = ruamel.yaml.comments.CommentedMap(repository)
+        repository = ruamel.yaml.comments.CommentedMap(
+            sorted(repository.items(), key=lambda t: t[0])
+        )
     return prettier(repository, check_type)
 
 
@@ -116,17 +117,9 @@ def load_yaml(filename):
         msg = f"{filename} is not a valid file"
         raise argparse.ArgumentTypeError(msg)
 
-    ruamel_instance = ruamel.yaml.YAML()
-    ruamel_instance.indent(  # Komodo prefers two space indendation
-        mapping=2,
-        sequence=4,
-        offset=2,
-    )
-    ruamel_instance.width = 1000  # Avoid ruamel wrapping long
-
     try:
         with open(filename, encoding="utf-8") as repo_handle:
-            return ruamel_instance.load(repo_handle)
+            return _RUAMEL_INSTANCE.load(repo_handle)
 
     except (
         ruamel.yaml.scanner.ScannerError,
@@ -12,12 +12,12 @@ def load_all_releases(files):
         current_release = load_yaml(filename)
 
         for lib, version in current_release.items():
-            if lib in used_versions:
-                used_versions[lib].append(version)
-            else:
-                used_versions[lib] = [version]
+            used_versions.setdefault(lib, []).append(version)
 
-    return used_versions
+    # Most versions are shared by many releases, keep each only once
+    return {
+        lib: list(dict.fromkeys(versions)) for lib, versions in used_versions.items()
+    }
 
 
 def find_unused_versions(used_versions, repository):
@@ -15,7 +15,9 @@ def pushd(path):
     os.chdir(prev)
 
 
-def shell(cmd: str, allow_failure=False) -> bytes:
+def shell(
+    cmd: str, allow_failure=False, cwd: str | None = None, env: dict | None = None
+) -> bytes:
     try:
         cmdlist = cmd.split(" ")
     except AttributeError:
@@ -23,11 +25,11 @@ def shell(cmd: str, allow_failure=False) -> bytes:
         # re-join and split
         cmdlist = " ".join(filter(None, cmd)).split(" ")
 
-    prompt = f"[{os.getcwd()}]>"
+    prompt = f"[{cwd or os.getcwd()}]>"
     print(prompt, " ".join(cmdlist))
 
     try:
-        return subprocess.check_output(tuple(filter(None, cmdlist)))
+        return subprocess.check_output(tuple(filter(None, cmdlist)), cwd=cwd, env=env)
     except subprocess.CalledProcessError as called_process_error:
         print(called_process_error.output, file=sys.stderr)
         if allow_failure:
@@ -1,12 +1,20 @@
 import argparse
+import contextlib
+import hashlib
+import marshal
 import os
+import stat
+import sys
 from collections import namedtuple
 from collections.abc import Mapping, MutableSet, Sequence
 from pathlib import Path
 
+import ruamel.yaml
 from ruamel.yaml import YAML
 from ruamel.yaml.constructor import DuplicateKeyError
 
+from komodo import __version__
+
 KomodoError = namedtuple(
     "KomodoError",
     ["package", "version", "maintainer", "depends", "err"],
@@ -44,23 +52,116 @@ def _komodo_error(package=None, version=None, maintainer=None, depends=None, err
     )
 
 
-def load_yaml_from_string(value: str) -> dict:
+# Used for files that are only read. It picks the libyaml based C parser when
+# available, but loses comments and formatting.
+_SAFE_YAML = YAML(typ="safe")
+
+
+def load_yaml_from_string(value: str, round_trip: bool = False) -> dict:
+    """Load value as YAML. Use round_trip if the content is going to be
+    written back, so that its comments are kept.
+    """
     try:
-        return YAML().load(value)
+        return (YAML() if round_trip else _SAFE_YAML).load(value)
     except DuplicateKeyError as duplicate_key_error:
         raise SystemExit(duplicate_key_error) from None
 
 
+def _is_flat_string_mapping(content: Mapping) -> bool:
+    """Fast path for validation, true if all keys and values are strings, in
+    which case no per package validation errors are possible.
+    """
+    return all(
+        isinstance(key, str) and isinstance(value, str)
+        for key, value in content.items()
+    )
+
+
+# Number of parsed files kept in the cache, the least recently used are removed
+_MAX_CACHED_FILES = 8
+
+
+def _parsed_yaml_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "komodo"
+
+
+def _is_private_to_user(path: Path) -> bool:
+    """Whether path is owned by the current user and not writable by others."""
+    status = path.stat()
+    return status.st_uid == os.getuid() and not status.st_mode & (
+        stat.S_IWGRP | stat.S_IWOTH
+    )
+
+
+def _evict_parsed_yaml_cache(cache_dir: Path) -> None:
+    cache_files = sorted(
+        cache_dir.glob("*.marshal"), key=lambda path: path.stat().st_mtime
+    )
+    for cache_file in cache_files[:-_MAX_CACHED_FILES]:
+        cache_file.unlink(missing_ok=True)
+
+
+def load_yaml_from_string_cached(value: str) -> dict:
+    """Like load_yaml_from_string, but reuse the result of an earlier run on
+    identical content. Parsing a large repository file dominates the startup
+    time of komodo, and CI typically runs it many times on the same file.
+
+    The parsed content is stored with marshal, which unlike pickle can not
+    run code when loaded. Cache files are only read when they are private to
+    the user, and the key covers everything the parsed result depends on.
+    """
+    key = hashlib.sha256(
+        "\0".join(
+            [
+                __version__,
+                ruamel.yaml.__version__,
+                ",".join(_SAFE_YAML.typ),
+                str(marshal.version),
+                sys.version,
+            ]
+        ).encode("utf-8")
+    )
+    key.update(value.encode("utf-8"))
+    cache_dir = _parsed_yaml_cache_dir()
+    cache_file = cache_dir / f"{key.hexdigest()}.marshal"
+    with contextlib.suppress(OSError, EOFError, ValueError, TypeError):
+        if _is_private_to_user(cache_dir) and _is_private_to_user(cache_file):
+            yml = marshal.loads(cache_file.read_bytes())
+            if isinstance(yml, dict):
+                # Mark as recently used, so that it is evicted last
+                os.utime(cache_file)
+                return yml
+    yml = load_yaml_from_string(value)
+    # Content that marshal can not represent, e.g. dates, is not cached
+    with contextlib.suppress(OSError, ValueError):
+        data = marshal.dumps(yml)
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _is_private_to_user(cache_dir):
+            return yml
+        # Write to a unique temporary file first, so that concurrent runs
+        # never read a partially written cache file
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(data)
+        tmp_file.replace(cache_file)
+        _evict_parsed_yaml_cache(cache_dir)
+    return yml
+
+
 class YamlFile(argparse.FileType):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__("r", *args, **kwargs)
 
     def __call__(self, value):
         file_handle = super().__call__(value)
-        yml = load_yaml_from_string(file_handle)
+        yml = self._load(file_handle)
         file_handle.close()
         return yml
 
+    @staticmethod
+    def _load(file_handle) -> dict:
+        return load_yaml_from_string(file_handle)
+
 
 class ReleaseFile(YamlFile):
     """Return the data from 'release' YAML file, but validate it first."""
@@ -90,6 +191,8 @@ class ReleaseFile(YamlFile):
             'python: 3.8.6-builtin\nsetuptools: 68.0.0\nwheel: 0.40.0\nzopfli: "0.3"'
         )
         assert isinstance(release_file_content, Mapping), message
+        if _is_flat_string_mapping(release_file_content):
+            return
         errors = []
         for package_name, package_version in release_file_content.items():
             error = Package.validate_package_entry_with_errors(
@@ -115,7 +218,7 @@ class ReleaseMatrixFile(YamlFile):
 
     @classmethod
     def from_yaml_string(cls, value: bytes):
-        yml = load_yaml_from_string(value)
+        yml = load_yaml_from_string(value, round_trip=True)
         cls.validate_release_matrix_file(yml)
         release_matrix_file = cls()
         release_matrix_file.content: dict = yml
@@ -130,6 +233,8 @@ class ReleaseMatrixFile(YamlFile):
             "python: 3.8.6-builtin\nsetuptools: 68.0.0\nwheel:\n  rhel7: 0.40.0\n  rhel8: 0.40.1"
         )
         assert isinstance(release_matrix_file_content, dict), message
+        if _is_flat_string_mapping(release_matrix_file_content):
+            return
         errors = set()
         for package_name, package_version in release_matrix_file_content.items():
             _recursive_validate_version_matrix(package_version, package_name, errors)
@@ -142,9 +247,9 @@ class ReleaseDir:
             raise NotADirectoryError(value)
         result = {}
         for yaml_file in Path(value).glob("*.yml"):
-            result[yaml_file.name.replace(".yml", "")] = ReleaseFile()(
-                yaml_file
-            ).content
+            yml = load_yaml_from_string(yaml_file.read_bytes())
+            ReleaseFile.validate_release_file(yml)
+            result[yaml_file.name.replace(".yml", "")] = yml
         return result
 
 
@@ -194,6 +299,10 @@ class RepositoryFile(YamlFile):
         self.validate_repository_file()
         return self
 
+    @staticmethod
+    def _load(file_handle) -> dict:
+        return load_yaml_from_string_cached(file_handle.read())
+
     def from_yaml_string(self, value: bytes):
         yml = load_yaml_from_string(value)
         self.content: dict = yml
@@ -362,7 +471,7 @@ class UpgradeProposalsFile(YamlFile):
         return self
 
     def from_yaml_string(self, value):
-        yml = load_yaml_from_string(value)
+        yml = load_yaml_from_string(value, round_trip=True)
         self.validate_upgrade_proposals_file(yml)
         self.content: dict = yml
         return self
@@ -469,6 +578,11 @@ class PackageStatusFile(YamlFile):
         handle_validation_errors(errors, message)
 
 
+# Returned by the validators when there is nothing to report, so that
+# validating a valid entry does not allocate a new list
+_NO_ERRORS: Sequence[str] = ()
+
+
 class Package:
     VALID_VISIBILITIES = ["public", "private", "private-plugin"]
     VALID_IMPORTANCES = ["low", "medium", "high"]
@@ -512,16 +626,15 @@ class Package:
         package_name: str,
         package_version: str,
         is_matrix_file: bool = False,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates package name and version, and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_entry(
                 package_name, package_version, is_matrix_file
             )
         except (ValueError, TypeError) as value_or_type_error:
-            errors.append(str(value_or_type_error))
-        return errors
+            return [str(value_or_type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_importance(package_name: str, package_importance: str) -> None:
@@ -541,14 +654,13 @@ class Package:
     def validate_package_importance_with_errors(
         package_name,
         package_importance: str,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates package importance of a package and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_importance(package_name, package_importance)
         except (ValueError, TypeError) as value_or_type_error:
-            errors.append(str(value_or_type_error))
-        return errors
+            return [str(value_or_type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_visibility(package_name: str, package_visibility: str) -> None:
@@ -582,14 +694,13 @@ class Package:
     def validate_package_maturity_with_errors(
         package_name: str,
         package_maturity: str,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates package maturity of a package and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_maturity(package_name, package_maturity)
         except (ValueError, TypeError) as value_or_type_error:
-            errors.append(str(value_or_type_error))
-        return errors
+            return [str(value_or_type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_make(
@@ -614,14 +725,13 @@ class Package:
         package_name: str,
         package_version: str,
         package_make: str,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates make of a package and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_make(package_name, package_version, package_make)
         except (ValueError, TypeError) as value_or_type_error:
-            errors.append(str(value_or_type_error))
-        return errors
+            return [str(value_or_type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_maintainer(
@@ -641,9 +751,8 @@ class Package:
         package_name: str,
         package_version: str,
         package_maintainer: str,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates maintainer of a package and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_maintainer(
                 package_name,
@@ -651,8 +760,8 @@ class Package:
                 package_maintainer,
             )
         except TypeError as type_error:
-            errors.append(str(type_error))
-        return errors
+            return [str(type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_source(
@@ -672,9 +781,8 @@ class Package:
         package_name: str,
         package_version: str,
         package_source: str,
-    ) -> list[str]:
+    ) -> Sequence[str]:
         """Validates source of a package and returns a list of error messages."""
-        errors = []
         try:
             Package.validate_package_source(
                 package_name,
@@ -682,8 +790,8 @@ class Package:
                 package_source,
             )
         except TypeError as type_error:
-            errors.append(str(type_error))
-        return errors
+            return [str(type_error)]
+        return _NO_ERRORS
 
     @staticmethod
     def validate_package_property_type(
@@ -4,6 +4,12 @@ from unittest.mock import mock_open, patch
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep files cached by komodo out of the home directory of the user."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+
+
 @pytest.fixture()
 def mock_komodo_env_vars():
     """Provide the environment vars from a komodo environment."""
@@ -88,7 +94,11 @@ def mock_release_file():
 @pytest.fixture()
 def captured_shell_commands(monkeypatch):
     commands = []
+
+    def capture(cmd, *_args, **_kwargs):
+        commands.append(cmd)
+
     with monkeypatch.context() as monkeypatch_context:
-        monkeypatch_context.setattr("komodo.build.shell", commands.append)
-        monkeypatch_context.setattr("komodo.fetch.shell", commands.append)
+        monkeypatch_context.setattr("komodo.build.shell", capture)
+        monkeypatch_context.setattr("komodo.fetch.shell", capture)
         yield commands
@@ -1,12 +1,25 @@
+import hashlib
+import io
+import os
+from graphlib import CycleError
+from pathlib import Path
+from unittest import mock
+
 import pytest
 
-from komodo.build import make
+from komodo.build import (
+    build_in_dependency_order,
+    dependency_graph,
+    download,
+    make,
+    pypaths,
+)
 
 
 def test_make_with_empty_pkgs(captured_shell_commands, tmpdir):
-    make({}, {}, {}, str(tmpdir))
-    assert len(captured_shell_commands) == 1
-    assert "mkdir" in " ".join(captured_shell_commands[0])
+    make({}, {}, {}, "/prefix", fakeroot=str(tmpdir))
+    assert captured_shell_commands == []
+    assert (Path(tmpdir) / "prefix").is_dir()
 
 
 @pytest.mark.usefixtures("captured_shell_commands")
@@ -26,4 +39,211 @@ def test_make_sh_does_not_accept_pypi_package_name(tmpdir):
     }
 
     with pytest.raises(ValueError, match=r"pypi_package_name"):
-        make(packages, repositories, {}, str(tmpdir))
+        make(packages, repositories, {}, "/prefix", fakeroot=str(tmpdir))
+
+
+def test_make_builds_dependencies_first(captured_shell_commands, tmpdir):
+    packages = {"app": "1.0.0", "lib": "2.0.0", "python": "3.11"}
+    repositories = {
+        "app": {
+            "1.0.0": {"make": "rsync", "maintainer": "someone", "depends": ["lib"]},
+        },
+        "lib": {
+            "2.0.0": {"make": "rsync", "maintainer": "someone", "depends": []},
+        },
+        "python": {
+            "3.11": {"make": "rsync", "maintainer": "someone"},
+        },
+    }
+
+    make(packages, repositories, {}, "/prefix", fakeroot=str(tmpdir))
+
+    rsynced = [
+        " ".join(filter(None, command))
+        for command in captured_shell_commands
+        if command[0] == "rsync -am"
+    ]
+    assert len(rsynced) == 3
+    assert "python-3.11/" in rsynced[0]
+    assert "lib-2.0.0/" in rsynced[1]
+    assert "app-1.0.0/" in rsynced[2]
+
+
+def test_build_in_dependency_order_waits_for_dependencies():
+    graph = {"a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"}}
+    built = []
+
+    build_in_dependency_order(graph, built.append, jobs=4)
+
+    assert built[0] == "a"
+    assert set(built[1:3]) == {"b", "c"}
+    assert built[3] == "d"
+
+
+def test_build_in_dependency_order_stops_on_failure():
+    graph = {"a": set(), "b": {"a"}}
+    built = []
+
+    def build(package_name):
+        if package_name == "a":
+            raise ValueError("a failed")
+        built.append(package_name)
+
+    with pytest.raises(ValueError, match="a failed"):
+        build_in_dependency_order(graph, build, jobs=2)
+    assert built == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_build_in_dependency_order_detects_cycles(jobs):
+    graph = {"a": {"b"}, "b": {"a"}}
+    built = []
+
+    with pytest.raises(CycleError):
+        build_in_dependency_order(graph, built.append, jobs=jobs)
+    assert built == []
+
+
+def _mock_download_response(monkeypatch, content):
+    response = mock.MagicMock(status_code=200, raw=io.BytesIO(content))
+    response.__enter__.return_value = response
+    monkeypatch.setattr(
+        "komodo.build.requests.Session.get", lambda *_args, **_kwargs: response
+    )
+
+
+def test_download_writes_file_with_matching_hash(monkeypatch, tmpdir):
+    content = b"some binary artifact"
+    _mock_download_response(monkeypatch, content)
+    (tmpdir / "bin").mkdir()
+
+    download(
+        package_name="artifact",
+        ver="1.0.0",
+        prefix="",
+        url="https://example.com/artifact",
+        hash_str=f"sha256:{hashlib.sha256(content).hexdigest()}",
+        fakeroot=str(tmpdir),
+        destination="bin/artifact",
+    )
+
+    dest_path = Path(tmpdir) / "bin" / "artifact"
+    assert dest_path.read_bytes() == content
+    assert os.access(dest_path, os.X_OK)
+
+
+def test_download_rejects_mismatching_hash(monkeypatch, tmpdir):
+    _mock_download_response(monkeypatch, b"some binary artifact")
+
+    with pytest.raises(ValueError, match="not equal to expected hash"):
+        download(
+            package_name="artifact",
+            ver="1.0.0",
+            prefix="",
+            url="https://example.com/artifact",
+            hash_str=f"sha256:{hashlib.sha256(b'something else').hexdigest()}",
+            fakeroot=str(tmpdir),
+            destination="artifact",
+        )
+
+
+def test_dependency_graph_ignores_dependencies_outside_release():
+    packages = {"app": "1.0.0", "lib": "2.0.0", "python": "3.11"}
+    repositories = {
+        "app": {"1.0.0": {"depends": ["lib", "setuptools"]}},
+        "lib": {"2.0.0": {}},
+        "python": {"3.11": {"depends": ["setuptools"]}},
+    }
+
+    assert dependency_graph(packages, repositories) == {
+        "app": {"lib", "python"},
+        "lib": {"python"},
+        "python": set(),
+    }
+
+
+def test_make_cmake_builds_and_installs_in_one_make(captured_shell_commands, tmpdir):
+    packages = {"lib": "2.0.0"}
+    repositories = {
+        "lib": {"2.0.0": {"make": "cmake", "maintainer": "someone"}},
+    }
+
+    make(
+        packages,
+        repositories,
+        {},
+        "/prefix",
+        builddir=str(tmpdir),
+        jobs=4,
+        fakeroot=str(tmpdir),
+    )
+
+    assert len(captured_shell_commands) == 2
+    assert captured_shell_commands[0][0] == "cmake"
+    assert captured_shell_commands[1] == f"make -j4 DESTDIR={tmpdir} install"
+    assert (Path(tmpdir) / "lib-2.0.0-build").is_dir()
+
+
+@pytest.mark.parametrize(
+    ("version", "expected"),
+    [
+        pytest.param(None, "", id="no_python"),
+        pytest.param("builtin", "", id="no_version_number"),
+        pytest.param(
+            "3.11.7-builtin",
+            "/prefix/lib/python3.11:/prefix/lib/python3.11/site-packages:"
+            "/prefix/lib64/python3.11/site-packages",
+            id="python_version",
+        ),
+    ],
+)
+def test_pypaths(version, expected):
+    assert pypaths("/prefix", version) == expected
+
+
+@pytest.mark.parametrize(
+    ("make_kwargs", "expected_package_jobs"),
+    [
+        pytest.param({"jobs": 8}, 1, id="jobs_only_sets_make_jobs"),
+        pytest.param({"jobs": 8, "package_jobs": 3}, 3, id="package_jobs"),
+    ],
+)
+def test_make_builds_packages_concurrently_only_with_package_jobs(
+    monkeypatch, tmpdir, make_kwargs, expected_package_jobs
+):
+    build_in_dependency_order = mock.MagicMock()
+    monkeypatch.setattr(
+        "komodo.build.build_in_dependency_order", build_in_dependency_order
+    )
+
+    make({}, {}, {}, "/prefix", fakeroot=str(tmpdir), **make_kwargs)
+
+    assert build_in_dependency_order.call_args.args[2] == expected_package_jobs
+
+
+def test_make_recreates_removed_prefix(tmpdir):
+    make({}, {}, {}, "/prefix", fakeroot=str(tmpdir))
+    (Path(tmpdir) / "prefix").rmdir()
+    make({}, {}, {}, "/prefix", fakeroot=str(tmpdir))
+    assert (Path(tmpdir) / "prefix").is_dir()
+
+
+def test_dependency_graph_leaves_out_pip_packages():
+    packages = {"lib": "2.0.0", "sphinx": "7.0", "sphinxcontrib-foo": "1.0"}
+    repositories = {
+        "lib": {"2.0.0": {"make": "sh", "depends": ["sphinx"]}},
+        "sphinx": {"7.0": {"make": "pip", "depends": ["sphinxcontrib-foo"]}},
+        "sphinxcontrib-foo": {"1.0": {"make": "pip", "depends": ["sphinx"]}},
+    }
+
+    assert dependency_graph(packages, repositories) == {"lib": set()}
+
+
+def test_make_ignores_dependency_cycles_among_pip_packages(tmpdir):
+    packages = {"sphinx": "7.0", "sphinxcontrib-foo": "1.0"}
+    repositories = {
+        "sphinx": {"7.0": {"make": "pip", "depends": ["sphinxcontrib-foo"]}},
+        "sphinxcontrib-foo": {"1.0": {"make": "pip", "depends": ["sphinx"]}},
+    }
+
+    make(packages, repositories, {}, "/prefix", fakeroot=str(tmpdir))
@@ -159,3 +159,21 @@ def test_cleanup_main_invalid_input_files(
     monkeypatch.setattr(sys, "argv", ["", repository_file_path, *release_file_paths])
     with expectation:
         cleanup_main()
+
+
+def test_cleanup_main_lists_unused_versions_sorted(monkeypatch, tmpdir, capsys):
+    with tmpdir.as_cwd():
+        (repository_file_path, release_file_paths) = _create_tmp_test_files(
+            VALID_REPOSITORY_FILE_CONTENT,
+            ["testpackage_a: 1.2.0\ntestpackage_c: 0.2.0"],
+        )
+
+    monkeypatch.setattr(sys, "argv", ["", repository_file_path, *release_file_paths])
+    cleanup_main()
+    output_print = capsys.readouterr()
+    assert output_print.out == (
+        "unused:\n"
+        "  - testpackage_b: 0.12.0\n"
+        "  - testpackage_d: 4.3.21\n"
+        "  - testpackage_e: 1.10.0\n"
+    )
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from komodo.cli import cli_main
+from komodo.cli import cli_main, parse_args
 from tests import _get_test_root
 
 
@@ -234,3 +234,21 @@ def test_bleeding_builds_marked_for_deletion_are_removed(tmpdir):
     assert count_release_folders_to_be_deleted() == len(test_dirs)
     cli_main()
     assert count_release_folders_to_be_deleted() == 0
+
+
+@pytest.mark.parametrize("package_jobs", ["0", "-1"])
+def test_package_jobs_must_be_positive(package_jobs, capsys):
+    with pytest.raises(SystemExit):
+        parse_args(
+            [
+                os.path.join(_get_test_root(), "data/cli/nominal_release.yml"),
+                os.path.join(_get_test_root(), "data/cli/nominal_repository.yml"),
+                "--prefix",
+                "prefix",
+                "--release",
+                "nominal_release",
+                "--package-jobs",
+                package_jobs,
+            ]
+        )
+    assert "argument --package-jobs" in capsys.readouterr().err
@@ -1,5 +1,9 @@
+import dataclasses
+import difflib
+import functools
 from base64 import b64encode
 from contextlib import ExitStack as does_not_raise
+from types import MappingProxyType
 from unittest import mock
 
 import github
@@ -8,8 +12,9 @@ import yaml
 
 from komodo.insert_proposals import (
     clean_proposals_file,
-    create_new_release_file,
+    commit_files,
     create_pr_with_changes,
+    diff_file_and_string,
     generate_contents_of_new_release_matrix,
     insert_proposals,
     recursive_update,
@@ -17,24 +22,83 @@ from komodo.insert_proposals import (
 )
 from komodo.yaml_file_types import RepositoryFile
 
-VALID_REPOSITORY_CONTENT = {
-    "addlib": {
-        "1.1.3": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-        "1.1.2": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-        "1.1.1": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-    },
-    "testlib2": {
-        "3.7": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-        "1.1.2": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-        "1.1.1": {"source": "pypi", "make": "pip", "maintainer": "scout"},
-    },
+try:
+    from yaml import CSafeDumper as _Dumper
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper
+    from yaml import SafeLoader as _Loader
+
+VALID_REPOSITORY_CONTENT = MappingProxyType(
+    {
+        "addlib": {
+            "1.1.3": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+            "1.1.2": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+            "1.1.1": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+        },
+        "testlib2": {
+            "3.7": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+            "1.1.2": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+            "1.1.1": {"source": "pypi", "make": "pip", "maintainer": "scout"},
+        },
+    }
+)
+
+BASE_MATRIX = {"testlib1": "1.1.1", "testlib2": "1.1.1"}
+
+# Upgrade proposals with nothing left to insert for release 1111.11
+CLEANED_UPGRADE_PROPOSALS = {"1111-11": None, "1111-12": {"testlib2": "ignore"}}
+
+# Files shared by most cases of test_insert_proposals
+REPO_FILE_BASE = {
+    "releases/matrices/1111.11.rc1.yml": BASE_MATRIX,
+    "repository.yml": VALID_REPOSITORY_CONTENT,
 }
 
 
+# Encoded file contents by id of the dict they were dumped from. The dict is
+# kept alongside, so that its id can not be reused by another object
+_ENCODED_CONTENTS: dict[int, tuple[dict, bytes]] = {}
+
+
+def _encode_content(dicty) -> bytes:
+    if id(dicty) not in _ENCODED_CONTENTS:
+        _ENCODED_CONTENTS[id(dicty)] = (
+            dicty,
+            # The safe dumper does not know MappingProxyType, so copy into a dict
+            b64encode(yaml.dump(dict(dicty), Dumper=_Dumper).encode()),
+        )
+    return _ENCODED_CONTENTS[id(dicty)][1]
+
+
+@dataclasses.dataclass
+class TreeElement:
+    """Stand-in for InputGitTreeElement, which only exposes its attributes
+    through the private _identity.
+    """
+
+    path: str
+    mode: str
+    type: str
+    content: str
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.content, str), self.content
+
+
+@pytest.fixture(autouse=True)
+def tree_element(monkeypatch):
+    monkeypatch.setattr("komodo.insert_proposals.InputGitTreeElement", TreeElement)
+
+
 class MockContent:
     def __init__(self, dicty) -> None:
         self.sha = "testsha"
-        self.content = b64encode(yaml.dump(dicty).encode())
+        self._dicty = dicty
+
+    @functools.cached_property
+    def content(self):
+        return _encode_content(self._dicty)
 
 
 class MockRepo:
@@ -42,8 +106,17 @@ class MockRepo:
 
     def __init__(self, files) -> None:
         self.files = files
-        self.updated_files = {}
+        self._updates = []
+        self.created_refs = {}
+        self.created_commits = []
         self.created_pulls = {}
+        self._branches = {}
+
+    @property
+    def updated_files(self):
+        updated_files = dict(self._updates)
+        assert len(updated_files) == len(self._updates), "File updated twice"
+        return updated_files
 
     def get_contents(self, filename, ref):
         if filename in self.files:
@@ -54,9 +127,10 @@ class MockRepo:
 
     def get_branch(self, ref):
         if ref in MockRepo.existing_branches:
-            output_mock = mock.Mock()
-            output_mock.commit.sha = "testsha1"
-            return output_mock
+            if ref not in self._branches:
+                self._branches[ref] = mock.Mock()
+                self._branches[ref].commit.sha = "testsha1"
+            return self._branches[ref]
         else:
             raise github.GithubException(None, None, None)
 
@@ -64,24 +138,29 @@ class MockRepo:
         _mock = mock.Mock()
         _mock.ref = ref
         _mock.sha = sha
+        self.created_refs[ref] = sha
         return _mock
 
-    def create_file(self, target_file, msg, content, branch):
-        assert target_file not in self.updated_files
-        self.updated_files[target_file] = {
-            "content": yaml.load(content, Loader=yaml.CLoader),
-            "branch": branch,
-            "msg": msg,
-        }
+    def create_git_tree(self, tree, base_tree):
+        for element in tree:
+            self._updates.append(
+                (
+                    element.path,
+                    {
+                        "content": yaml.load(element.content, Loader=_Loader),
+                        "base_tree": base_tree,
+                    },
+                )
+            )
+        return mock.Mock()
 
-    def update_file(self, target_file, msg, content, sha, branch):
-        assert target_file not in self.updated_files
-        self.updated_files[target_file] = {
-            "content": yaml.load(content, Loader=yaml.CLoader),
-            "branch": branch,
-            "msg": msg,
-            "sha": sha,
-        }
+    def create_git_commit(self, message, tree, parents):
+        _mock = mock.Mock()
+        _mock.message = message
+        _mock.tree = tree
+        _mock.parents = parents
+        self.created_commits.append(_mock)
+        return _mock
 
     def create_pull(self, title, body, head, base):
         output_mock = mock.Mock()
@@ -89,6 +168,27 @@ class MockRepo:
         return output_mock
 
 
+def _release_case(repo_files, changed_files, case_id):
+    """A case where release 1111.11.rc2 is successfully made from 1111.11.rc1."""
+    return pytest.param(
+        "1111.11.rc1",
+        "1111.11.rc2",
+        repo_files,
+        changed_files,
+        ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
+        type(None),
+        "",
+        id=case_id,
+    )
+
+
+def _failing_case(base, target, repo_files, return_type, error_message, case_id):
+    """A case where no files are changed and no pull requests are made."""
+    return pytest.param(
+        base, target, repo_files, {}, [], return_type, error_message, id=case_id
+    )
+
+
 @pytest.mark.parametrize(
     (
         "base",
@@ -100,48 +200,24 @@ class MockRepo:
         "error_message",
     ),
     [
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
-                "upgrade_proposals.yml": {
-                    "1111-11": None,
-                    "1111-12": {"testlib2": "ignore"},
-                },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
+                **REPO_FILE_BASE,
+                "upgrade_proposals.yml": CLEANED_UPGRADE_PROPOSALS,
             },
             {
-                "releases/matrices/1111.11.rc2.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
-                "upgrade_proposals.yml": {
-                    "1111-11": None,
-                    "1111-12": {"testlib2": "ignore"},
-                },
+                "releases/matrices/1111.11.rc2.yml": BASE_MATRIX,
+                "upgrade_proposals.yml": CLEANED_UPGRADE_PROPOSALS,
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="empty_upgrade_proposal",
+            case_id="empty_upgrade_proposal",
         ),
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": {"testlib2": "1.1.2", "addlib": "1.1.3"},
                     "1111-12": {"testlib2": "ignore"},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
             {
                 "releases/matrices/1111.11.rc2.yml": {
@@ -149,24 +225,13 @@ class MockRepo:
                     "testlib2": "1.1.2",
                     "addlib": "1.1.3",
                 },
-                "upgrade_proposals.yml": {
-                    "1111-11": None,
-                    "1111-12": {"testlib2": "ignore"},
-                },
+                "upgrade_proposals.yml": CLEANED_UPGRADE_PROPOSALS,
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="with_upgrade_proposal",
+            case_id="with_upgrade_proposal",
         ),
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": {
                         "testlib2": {
@@ -175,7 +240,6 @@ class MockRepo:
                         },
                     },
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
             {
                 "releases/matrices/1111.11.rc2.yml": {
@@ -187,23 +251,14 @@ class MockRepo:
                 },
                 "upgrade_proposals.yml": {"1111-11": None},
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="update_from_version_to_full_matrix",
+            case_id="update_from_version_to_full_matrix",
         ),
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": {"testlib2": {"py38": "1.1.2", "py311": "1.1.1"}},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
             {
                 "releases/matrices/1111.11.rc2.yml": {
@@ -212,14 +267,9 @@ class MockRepo:
                 },
                 "upgrade_proposals.yml": {"1111-11": None},
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="update_from_version_to_py_matrix",
+            case_id="update_from_version_to_py_matrix",
         ),
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
                 "releases/matrices/1111.11.rc1.yml": {
                     "testlib1": "1.1.1",
@@ -240,25 +290,16 @@ class MockRepo:
                 },
                 "upgrade_proposals.yml": {"1111-11": None},
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="update_from_matrix_to_version",
+            case_id="update_from_matrix_to_version",
         ),
-        pytest.param(
-            "1111.11.rc1",
-            "1111.11.rc2",
+        _release_case(
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": {
                         "testlib2": {"py38": None, "py311": "1.1.2"},
                     },
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
             {
                 "releases/matrices/1111.11.rc2.yml": {
@@ -267,108 +308,76 @@ class MockRepo:
                 },
                 "upgrade_proposals.yml": {"1111-11": None},
             },
-            ["Temporary PR 1111.11.rc2", "Add release 1111.11.rc2"],
-            type(None),
-            "",
-            id="remove_package_from_one_py_version",
+            case_id="remove_package_from_one_py_version",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc2",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": {"testlib2": "1.1.2"},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
-            {},
-            [],
             AssertionError,
             r"No section for this release \(1111-12\) in upgrade_proposals\.yml",
-            id="missing_proposal_heading",
+            case_id="missing_proposal_heading",
         ),
-        pytest.param(
+        _failing_case(
             MockRepo.existing_branches[-2],
             MockRepo.existing_branches[-1],
             {},
-            {},
-            [],
             ValueError,
             "Branch 2222.22.rc2 exists already",
-            id="branch_already_exists",
+            case_id="branch_already_exists",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": None,
                     "1111-12": {"addlib": "1.1.4"},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
-            {},
-            [],
             SystemExit,
             "Version '1.1.4' of package 'addlib' not found in repository",
-            id="upgrade_proposal_new_version_not_present_in_repository",
+            case_id="upgrade_proposal_new_version_not_present_in_repository",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": None,
                     "1111-12": {"package_does_not_exist": "1.1.4"},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
-            {},
-            [],
             SystemExit,
             "Package 'package_does_not_exist' not found in repository",
-            id="upgrade_proposal_new_package_not_present_in_repository",
+            case_id="upgrade_proposal_new_package_not_present_in_repository",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                **REPO_FILE_BASE,
                 "upgrade_proposals.yml": {
                     "1111-11": None,
                     "1111-12": {"testlib2": 3.7},
                 },
-                "repository.yml": VALID_REPOSITORY_CONTENT,
             },
-            {},
-            [],
             SystemExit,
             r"invalid version type ",
-            id="float_version_number_in_proposal",
+            case_id="float_version_number_in_proposal",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                "releases/matrices/1111.11.rc1.yml": BASE_MATRIX,
                 "upgrade_proposals.yml": {
                     "1111-11": None,
                     "1111-12": {"addlib": "1.1.2"},
@@ -389,20 +398,15 @@ class MockRepo:
                     },
                 },
             },
-            {},
-            [],
             SystemExit,
             r"has invalid version type",
-            id="float_version_number_in_repository",
+            case_id="float_version_number_in_repository",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
-                "releases/matrices/1111.11.rc1.yml": {
-                    "testlib1": "1.1.1",
-                    "testlib2": "1.1.1",
-                },
+                "releases/matrices/1111.11.rc1.yml": BASE_MATRIX,
                 "upgrade_proposals.yml": {
                     "1111-11": None,
                     "1111-12": {"addlib": "1.1.2"},
@@ -427,13 +431,11 @@ class MockRepo:
                     },
                 },
             },
-            {},
-            [],
             SystemExit,
             r"Did you mean 'v1.1.2'",
-            id="mismatching_version_format",
+            case_id="mismatching_version_format",
         ),
-        pytest.param(
+        _failing_case(
             "1111.11.rc1",
             "1111.12.rc1",
             {
@@ -465,11 +467,9 @@ class MockRepo:
                     },
                 },
             },
-            {},
-            [],
             SystemExit,
             r"not found in repository. Did you mean",
-            id="mismatching_casing_files",
+            case_id="mismatching_casing_files",
         ),
     ],
 )
@@ -492,6 +492,14 @@ def test_insert_proposals(
             insert_proposals(repo, base, target, "git_ref", "jobname", "joburl")
     else:
         insert_proposals(repo, base, target, "git_ref", "jobname", "joburl")
+        assert len(repo.created_commits) == 1
+        commit = repo.created_commits[0]
+        base_commit = repo.get_branch("git_ref").commit
+        assert commit.parents == [base_commit.commit]
+        assert repo.created_refs == {
+            f"refs/heads/{target}.tmp": commit.sha,
+            f"refs/heads/{target}": base_commit.sha,
+        }
 
     assert len(changed_files) == len(repo.updated_files)
     for file, content in changed_files.items():
@@ -515,8 +523,17 @@ class MockRepoYaml:
 
     def __init__(self, files) -> None:
         self.files = files
-        self.updated_files = {}
+        self._updates = []
+        self.created_refs = {}
+        self.created_commits = []
         self.created_pulls = {}
+        self._branches = {}
+
+    @property
+    def updated_files(self):
+        updated_files = dict(self._updates)
+        assert len(updated_files) == len(self._updates), "File updated twice"
+        return updated_files
 
     def get_contents(self, filename, ref):
         if filename in self.files:
@@ -527,9 +544,10 @@ class MockRepoYaml:
 
     def get_branch(self, ref):
         if ref in MockRepoYaml.existing_branches:
-            output_mock = mock.Mock()
-            output_mock.commit.sha = "testsha1"
-            return output_mock
+            if ref not in self._branches:
+                self._branches[ref] = mock.Mock()
+                self._branches[ref].commit.sha = "testsha1"
+            return self._branches[ref]
         else:
             raise github.GithubException(None, None, None)
 
@@ -537,24 +555,30 @@ class MockRepoYaml:
         _mock = mock.Mock()
         _mock.ref = ref
         _mock.sha = sha
+        self.created_refs[ref] = sha
         return _mock
 
-    def create_file(self, target_file, msg, content, branch):
-        assert target_file not in self.updated_files
-        self.updated_files[target_file] = {
-            "content": yaml.load(content, Loader=yaml.CLoader),
-            "branch": branch,
-            "msg": msg,
-        }
+    def create_git_tree(self, tree, base_tree):
+        for element in tree:
+            self._updates.append(
+                (
+                    element.path,
+                    {
+                        "content": yaml.load(element.content, Loader=_Loader),
+                        "raw_content": element.content,
+                        "base_tree": base_tree,
+                    },
+                )
+            )
+        return mock.Mock()
 
-    def update_file(self, target_file, msg, content, sha, branch):
-        assert target_file not in self.updated_files
-        self.updated_files[target_file] = {
-            "content": yaml.load(content, Loader=yaml.CLoader),
-            "branch": branch,
-            "msg": msg,
-            "sha": sha,
-        }
+    def create_git_commit(self, message, tree, parents):
+        _mock = mock.Mock()
+        _mock.message = message
+        _mock.tree = tree
+        _mock.parents = parents
+        self.created_commits.append(_mock)
+        return _mock
 
     def create_pull(self, title, body, head, base):
         output_mock = mock.Mock()
@@ -672,6 +696,33 @@ def test_duplicate_package_entry_handling(
         assert pull_request in repo.created_pulls
 
 
+def test_insert_proposals_keeps_comments():
+    repo = MockRepoYaml(
+        files={
+            "releases/matrices/1111.11.rc1.yml": (
+                "testlib1: 1.1.1\ntestlib2:\n  rhel7: 1.1.1  # pinned\n  rhel8: 1.1.1\n"
+            ),
+            "upgrade_proposals.yml": (
+                "1111-11:\n1111-12:\n  # keep until release Y\n  addlib: 1.1.2\n"
+            ),
+            "repository.yml": (
+                "addlib:\n  1.1.2:\n    source: pypi\n    make: pip\n"
+                "    maintainer: scout\n"
+            ),
+        }
+    )
+    insert_proposals(repo, "1111.11.rc1", "1111.11.rc2", "git_ref", "jobname", "joburl")
+
+    updated_files = repo.updated_files
+    assert (
+        "# keep until release Y"
+        in updated_files["upgrade_proposals.yml"]["raw_content"]
+    )
+    assert (
+        "# pinned" in updated_files["releases/matrices/1111.11.rc2.yml"]["raw_content"]
+    )
+
+
 @pytest.mark.parametrize(
     "release_dict, upgrade_dict, expected_dict",
     [
@@ -964,21 +1015,10 @@ def test_generate_contents_of_new_release_returns_valid(upgrade, expected_result
 def test_clean_proposals_file(
     propose_upgrade_content, upgrade_key, expected_upgrade_proposals_end_content
 ):
-    repo_files = {
-        "releases/matrices/1111.11.rc1.yml": {
-            "testlib1": "1.1.1",
-            "testlib2": "1.1.1",
-        },
-        "upgrade_proposals.yml": propose_upgrade_content,
-        "repository.yml": VALID_REPOSITORY_CONTENT,
-    }
-    repo = MockRepo(files=repo_files)
-    clean_proposals_file(
-        propose_upgrade_content, upgrade_key, repo, "git_ref", "tmp_target"
-    )
+    cleaned_upgrade = clean_proposals_file(propose_upgrade_content, upgrade_key)
     assert propose_upgrade_content == expected_upgrade_proposals_end_content
     assert (
-        repo.updated_files["upgrade_proposals.yml"]["content"]
+        yaml.load(cleaned_upgrade, Loader=_Loader)
         == expected_upgrade_proposals_end_content
     )
 
@@ -995,13 +1035,66 @@ def test_create_pr_with_changes():
     assert "Temporary PR target" in mock_repo.created_pulls
 
 
-def test_create_new_release_file():
+def test_commit_files():
     mock_repo = MockRepo({})
+    base_commit = mock.Mock()
     stub_file_content = "setuptools: 0.14.9\npython: 3.8.6"
-    new_release_file_name = create_new_release_file(
-        mock_repo, "1111.11", stub_file_content, "branchy"
+    tmp_ref = commit_files(
+        mock_repo,
+        base_commit,
+        "branchy",
+        {
+            "releases/matrices/1111.11.yml": stub_file_content,
+            "upgrade_proposals.yml": "1111-11:\n",
+        },
+        "Add release 1111.11",
     )
-    assert new_release_file_name == "releases/matrices/1111.11.yml"
-    assert mock_repo.updated_files[new_release_file_name]["content"] == yaml.load(
-        stub_file_content, Loader=yaml.CLoader
+    assert tmp_ref.ref == "refs/heads/branchy"
+    assert mock_repo.updated_files["releases/matrices/1111.11.yml"][
+        "content"
+    ] == yaml.load(stub_file_content, Loader=_Loader)
+    assert mock_repo.updated_files["upgrade_proposals.yml"]["content"] == {
+        "1111-11": None
+    }
+    for updated_file in mock_repo.updated_files.values():
+        assert updated_file["base_tree"] is base_commit.tree
+
+
+@pytest.mark.parametrize(
+    ("file_contents", "string"),
+    [
+        pytest.param("a: 1\nb: 2\n", "a: 1\nb: 2\n", id="no_changes"),
+        pytest.param(
+            "testlib1: 1.1.1\ntestlib2: 1.1.1\nzlib:\n  rhel7: 1.0\n",
+            "addlib: 1.1.3\ntestlib1: 1.1.1\ntestlib2: 1.1.2\nzlib:\n  rhel7: 1.1\n",
+            id="changes_below_top_level_keys",
+        ),
+        pytest.param("a: 1\n", "a: 1", id="no_newline_at_end_of_file"),
+        pytest.param(
+            "lib:\n  maintainer: \u00c5se\n",
+            "lib:\n  maintainer: J\u00f8rgen\n",
+            id="non_ascii_content",
+        ),
+    ],
+)
+@pytest.mark.parametrize("git_available", [True, False])
+def test_diff_file_and_string_in_difflib_format(
+    file_contents, string, git_available, monkeypatch
+):
+    # git and difflib may align hunks differently in general, but they agree
+    # on these inputs, so the whole output can be compared
+    if not git_available:
+        monkeypatch.setattr(
+            "komodo.insert_proposals.subprocess.run",
+            mock.Mock(side_effect=FileNotFoundError("git")),
+        )
+    expected = "".join(
+        difflib.unified_diff(
+            file_contents.splitlines(True),
+            string.splitlines(True),
+            "base",
+            "target",
+            n=0,
+        )
     )
+    assert diff_file_and_string(file_contents, string, "base", "target") == expected
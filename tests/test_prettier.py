@@ -2,7 +2,8 @@ from pathlib import Path
 
 import pytest
 
-from komodo.prettier import load_yaml, prettier
+from komodo.prettier import load_yaml, prettier, write_to_string
+from komodo.yaml_file_types import load_yaml_from_string
 
 INPUT_FOLDER = Path(__file__).resolve().parent / "input"
 
@@ -26,3 +27,12 @@ def test_release_prettifying():
 def test_duplicate_entries():
     with pytest.raises(SystemExit):
         load_yaml(INPUT_FOLDER / "duplicate_repository.yml")
+
+
+def test_safe_loaded_repository_prettifying():
+    repository = (
+        "package_b:\n  1.0.0:\n    make: pip\npackage_a:\n  2.0.0:\n    make: sh\n"
+    )
+    assert write_to_string(load_yaml_from_string(repository)) == (
+        "package_a:\n  2.0.0:\n    make: sh\n\npackage_b:\n  1.0.0:\n    make: pip\n"
+    )
@@ -64,6 +64,14 @@ def test_load_all_releases():
     assert set(used_versions["lib4"]) == {"3.4.5"}
 
 
+def test_load_all_releases_keeps_each_version_once():
+    release = os.path.join(_get_test_root(), "data/test_releases/2020.01.a1-py27.yml")
+    used_versions = load_all_releases([release, release])
+
+    for versions in used_versions.values():
+        assert len(versions) == len(set(versions)) == 1
+
+
 def test_unused_versions():
     files = [
         os.path.join(_get_test_root(), "data/test_releases/2020.01.a1-py27.yml"),
@@ -6,7 +6,9 @@ import pytest
 
 from komodo.release_transpiler import main as release_transpiler_main
 
-VALID_RELEASE_FOLDER = abspath(dirname(__file__) + "/data/test_releases")
+# Relative to the temporary directory that each test runs in, so that the
+# transpiled files are not written into the shared test data
+VALID_RELEASE_FOLDER = "."
 VALID_RELEASE_BASE = "2020.01.a1"
 VALID_OVERRIDE_MAPPING_FILE = abspath(
     dirname(dirname(__file__)) + "/examples/stable.yml",
@@ -22,6 +24,12 @@ def does_not_raise():
     yield
 
 
+@pytest.fixture(autouse=True)
+def run_in_tmpdir(tmpdir):
+    with tmpdir.as_cwd():
+        yield
+
+
 @pytest.mark.parametrize(
     ("args", "expectation"),
     [
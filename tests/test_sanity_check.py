@@ -1,8 +1,14 @@
+import re
+
 import pytest
 
 from komodo.lint_symlink_config import lint_symlink_config
 from komodo.symlink.sanity_check import assert_root_nodes, suggest_missing_roots
 
+_MISSING_ROOTS_RE = re.compile(
+    r"Missing root\(s\): \[(?=.*missing_root_1)(?=.*missing_root_2)(?=.*missing_root_3)"
+)
+
 
 def test_suggest_missing_root_links():
     link_dict = {
@@ -34,7 +40,7 @@ def test_assert_root_nodes_error_message_missing_roots():
 
     with pytest.raises(
         AssertionError,
-        match=r"Missing root\(s\): \[(?=.*missing_root_1)(?=.*missing_root_2)(?=.*missing_root_3)",
+        match=_MISSING_ROOTS_RE,
     ):
         assert_root_nodes(link_dict)
 
@@ -1,3 +1,4 @@
+import os
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -5,11 +6,14 @@ import pytest
 
 from komodo.yaml_file_types import (
     KomodoException,
+    Package,
     PackageStatusFile,
     ReleaseDir,
     ReleaseFile,
+    ReleaseMatrixFile,
     RepositoryFile,
     _komodo_error,
+    load_yaml_from_string_cached,
 )
 
 
@@ -870,3 +874,102 @@ def test_release_dir_with_two_releases(tmpdir):
             "somerelease": {"foo": "0.4.1"},
             "anotherrelease": {"bar": "1.4.1"},
         }
+
+
+def test_release_dir_with_invalid_release(tmpdir):
+    with tmpdir.as_cwd():
+        Path("releases").mkdir()
+        Path("releases/somerelease.yml").write_text("foo: 0.4.1", encoding="utf-8")
+        Path("releases/repository.yml").write_text(
+            "foo:\n  0.4.1:\n    make: pip", encoding="utf-8"
+        )
+        with pytest.raises(SystemExit, match="does not appear to be a release file"):
+            ReleaseDir()("releases")
+
+
+@pytest.mark.parametrize(
+    "package_name, package_version, expected_errors",
+    [
+        pytest.param("foo", "1.0.0", [], id="valid_entry"),
+        pytest.param(
+            "foo",
+            1.0,
+            ["Package 'foo' has invalid version type (1.0)"],
+            id="invalid_version",
+        ),
+    ],
+)
+def test_validate_package_entry_with_errors(
+    package_name, package_version, expected_errors
+):
+    errors = Package.validate_package_entry_with_errors(package_name, package_version)
+    assert list(errors) == expected_errors
+
+
+def _cache_files():
+    return list((Path(os.environ["XDG_CACHE_HOME"]) / "komodo").glob("*.marshal"))
+
+
+@pytest.fixture()
+def fail_on_parse(monkeypatch):
+    def fail(_value):
+        raise AssertionError("cached content should not be parsed again")
+
+    monkeypatch.setattr("komodo.yaml_file_types.load_yaml_from_string", fail)
+
+
+def test_load_yaml_from_string_cached_reuses_earlier_parse(request):
+    assert load_yaml_from_string_cached("foo: 0.4.1") == {"foo": "0.4.1"}
+    request.getfixturevalue("fail_on_parse")
+    assert load_yaml_from_string_cached("foo: 0.4.1") == {"foo": "0.4.1"}
+
+
+def test_load_yaml_from_string_cached_ignores_corrupt_cache():
+    load_yaml_from_string_cached("foo: 0.4.1")
+    (cache_file,) = _cache_files()
+    cache_file.write_bytes(b"not marshal data")
+    assert load_yaml_from_string_cached("foo: 0.4.1") == {"foo": "0.4.1"}
+
+
+def test_load_yaml_from_string_cached_depends_on_komodo_version(monkeypatch):
+    load_yaml_from_string_cached("foo: 0.4.1")
+    monkeypatch.setattr("komodo.yaml_file_types.__version__", "0.0.0")
+    load_yaml_from_string_cached("foo: 0.4.1")
+    assert len(_cache_files()) == 2
+
+
+def test_load_yaml_from_string_cached_ignores_cache_writable_by_others(request):
+    load_yaml_from_string_cached("foo: 0.4.1")
+    (cache_file,) = _cache_files()
+    cache_file.chmod(0o666)
+    request.getfixturevalue("fail_on_parse")
+    with pytest.raises(AssertionError, match="should not be parsed again"):
+        load_yaml_from_string_cached("foo: 0.4.1")
+
+
+def test_load_yaml_from_string_cached_keeps_most_recently_used(monkeypatch):
+    monkeypatch.setattr("komodo.yaml_file_types._MAX_CACHED_FILES", 2)
+    for version in ["0.1", "0.2", "0.3"]:
+        load_yaml_from_string_cached(f"foo: {version}")
+    assert len(_cache_files()) == 2
+
+
+@pytest.mark.parametrize(
+    "validate",
+    [ReleaseFile.validate_release_file, ReleaseMatrixFile.validate_release_matrix_file],
+)
+def test_all_string_release_takes_fast_path(validate, monkeypatch):
+    def fail(*_args, **_kwargs):
+        raise AssertionError("all string releases should not be validated per package")
+
+    monkeypatch.setattr(Package, "validate_package_entry_with_errors", fail)
+    validate({"python": "3.8.6-builtin", "setuptools": "68.0.0"})
+
+
+@pytest.mark.parametrize(
+    "validate",
+    [ReleaseFile.validate_release_file, ReleaseMatrixFile.validate_release_matrix_file],
+)
+def test_non_string_version_is_reported_despite_fast_path(validate):
+    with pytest.raises(SystemExit, match="invalid version type"):
+        validate({"python": "3.8.6-builtin", "setuptools": 68.0})